@@ -12,13 +12,24 @@ The tricky part with healthcare apps is that tokens need to be validated
 against the identity provider's public keys, which can rotate.
 """
 
+import asyncio
+import base64
+import binascii
+import hashlib
 import jwt
+import logging
+import orjson
+from collections import OrderedDict
+import httpx
 import requests
+import time
 from datetime import datetime, timezone
 from typing import Optional, Dict, List
-from functools import lru_cache
 from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 from dotenv import load_dotenv
 import json
@@ -31,6 +42,8 @@ _env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".env"
 load_dotenv(dotenv_path=_env_path, override=False)
 AUTH_DEBUG = os.getenv("AUTH_DEBUG", "false").lower() == "true"
 
+logger = logging.getLogger(__name__)
+
 # I'm using dependency injection pattern here - FastAPI's way of handling auth
 security = HTTPBearer()
 
@@ -42,6 +55,19 @@ class JWTValidator:
     incoming JWTs. I'm caching the JWKS to avoid hitting Auth0 on every request.
     """
     
+    # How long (seconds) we trust a fetched JWKS before refreshing it.
+    # Auth0 rotates keys rarely, so 5 minutes is a comfortable balance
+    # between freshness and not hammering the IdP.
+    JWKS_TTL = 300
+    # How long past the TTL we'll keep serving the cached keys while a
+    # background refresh is in flight ("stale-while-revalidate"). Once
+    # this runs out too, we fail closed and refresh synchronously.
+    JWKS_MAX_STALE = 900
+    # How many validated token payloads to remember. RS256 verification is
+    # the dominant auth cost, so repeat callers within a token's lifetime
+    # should pay a dict lookup, not an RSA verify.
+    PAYLOAD_CACHE_SIZE = 4096
+
     def __init__(self, domain: str, audience: str):
         self.domain = domain
         self.audience = audience
@@ -55,18 +81,74 @@ class JWTValidator:
         else:
             self.jwks_url = None
             self.issuer = None
-    
-    @lru_cache(maxsize=1)
-    def get_jwks(self) -> Dict:
+        # Validate configuration once here instead of re-checking issuer
+        # and audience on every validate_token call - they're invariant for
+        # the life of the process. A misconfigured validator still constructs
+        # (so the app can boot and serve its health/config endpoints) but
+        # every token validation reports the problem with a single branch.
+        self._config_error = self._validate_config()
+        # Prepared signing keys indexed by 'kid'. Building an RSA key object
+        # from a JWK is expensive, so we do it once per refresh instead of
+        # once per request.
+        self._keys_by_kid: Dict[str, object] = {}
+        self._fetched_at: float = 0.0
+        # HTTP cache validators from the last successful fetch. Auth0 serves
+        # the JWKS with ETag/Cache-Control, so refreshes can usually be
+        # answered with a cheap 304 instead of a full download.
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._max_age: int = 0
+        # Single-flight guard so concurrent requests don't stampede the IdP
+        # when the cache goes soft-stale.
+        self._refresh_lock = asyncio.Lock()
+        # Strong reference to the in-flight background refresh - the event
+        # loop only keeps weak refs to tasks, so without this the refresh
+        # could be garbage-collected mid-flight.
+        self._refresh_task: Optional["asyncio.Task"] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        # LRU of already-validated payloads keyed by a token digest, each
+        # entry good until the token's own exp. Cleared on key rotation.
+        self._payload_cache: "OrderedDict[bytes, tuple]" = OrderedDict()
+        # Reusable JWS verifier. jwt.decode rebuilds its options dict and
+        # walks every registered claim validator per call; since our
+        # issuer/audience are process constants we verify the signature via
+        # PyJWS and check the three claims we care about inline.
+        self._jws = jwt.PyJWS()
+        self._algorithms = ['RS256']  # Auth0 uses RS256
+        # Persistent session so JWKS refreshes reuse the TCP/TLS connection
+        # to the IdP instead of paying a fresh handshake every time
+        self._http = requests.Session()
+        self._http.mount('https://', HTTPAdapter(
+            max_retries=Retry(total=2, backoff_factor=0.1)
+        ))
+
+    def _validate_config(self) -> Optional[str]:
+        """Return a description of any config problem, or None when usable."""
+        if not self.issuer:
+            return (
+                "Auth configuration error: AUTH0_DOMAIN is not set. "
+                "Please set AUTH0_DOMAIN (e.g. dev-xyz.us.auth0.com) in backend/.env or environment."
+            )
+        if not self.audience:
+            return (
+                "Auth configuration error: AUTH0_AUDIENCE is not set. "
+                "Configure it to the API Identifier from Auth0 (e.g. https://your-api)."
+            )
+        return None
+
+    def _refresh_jwks(self) -> None:
         """
-        Fetch the JSON Web Key Set from Auth0
-        
+        Fetch the JSON Web Key Set from Auth0 and index it by key ID
+
         I'm caching this because:
         1. JWKS doesn't change often (only during key rotation)
         2. We don't want to hit Auth0 on every request
         3. It's expensive to fetch over the network
-        
-        In production, I'd add TTL and refresh logic for key rotation
+
+        The expensive part isn't just the network call - converting each JWK
+        into an RSA public key object costs real CPU. So we materialize every
+        key once per refresh and store them in a {kid: key} dict, making the
+        per-request lookup O(1) with no re-parsing.
         """
         # Ensure configuration is present
         if not self.jwks_url:
@@ -78,9 +160,9 @@ class JWTValidator:
                 ),
             )
         try:
-            response = requests.get(self.jwks_url, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            # Conditional headers make most refreshes a cheap 304
+            response = self._http.get(self.jwks_url, headers=self._conditional_headers(), timeout=10)
+            self._apply_jwks_response(response)
         except requests.RequestException as e:
             # If we can't get JWKS, we can't validate any tokens
             # This is a hard failure - better to be secure than sorry
@@ -88,28 +170,149 @@ class JWTValidator:
                 status_code=503,
                 detail=f"Unable to fetch JWKS from identity provider: {str(e)}"
             )
-    
-    def get_signing_key(self, token_header: Dict) -> str:
+
+    def _conditional_headers(self) -> Dict[str, str]:
+        """Validators for a conditional JWKS fetch (empty on cold cache)."""
+        headers = {}
+        if self._keys_by_kid:
+            if self._etag:
+                headers['If-None-Match'] = self._etag
+            if self._last_modified:
+                headers['If-Modified-Since'] = self._last_modified
+        return headers
+
+    def _apply_jwks_response(self, response) -> None:
+        """Ingest a JWKS HTTP response (requests or httpx) into the key index."""
+        if response.status_code == 304:
+            # Not modified - keep the current keys, just reset the clock
+            self._fetched_at = time.monotonic()
+            return
+        response.raise_for_status()
+        # orjson parses straight from the response bytes - faster than
+        # stdlib json and skips the intermediate bytes->str decode
+        jwks = orjson.loads(response.content)
+
+        # Remember cache validators for the next conditional fetch
+        self._etag = response.headers.get('ETag')
+        self._last_modified = response.headers.get('Last-Modified')
+        self._max_age = self._parse_max_age(response.headers.get('Cache-Control', ''))
+
+        # Convert each JWK to a key object once, up front
+        keys_by_kid = {}
+        for key in jwks.get('keys', []):
+            if 'kid' in key:
+                keys_by_kid[key['kid']] = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
+        self._keys_by_kid = keys_by_kid
+        self._fetched_at = time.monotonic()
+        # New key material - anything validated against the old set must be
+        # re-verified, so drop the payload cache wholesale
+        self._payload_cache.clear()
+
+    def needs_soft_refresh(self) -> bool:
+        """True when the cache is past its TTL but still within max-stale."""
+        if not self.jwks_url or not self._keys_by_kid:
+            return False
+        age = time.monotonic() - self._fetched_at
+        return self._jwks_ttl < age <= self._jwks_ttl + self.JWKS_MAX_STALE
+
+    def _is_hard_expired(self) -> bool:
+        """True when the cache is empty or too stale to trust (fail closed)."""
+        if not self._keys_by_kid:
+            return True
+        return time.monotonic() - self._fetched_at > self._jwks_ttl + self.JWKS_MAX_STALE
+
+    async def refresh_jwks_async(self) -> None:
+        """
+        Refresh the JWKS off the request path
+
+        Scheduled as a background task when the cache goes soft-stale, so
+        the fetch latency never lands on a request. The lock makes the
+        refresh single-flight; failures are swallowed because we still have
+        usable (if stale) keys and the hard expiry will fail closed anyway.
+        """
+        if self._refresh_lock.locked():
+            return
+        async with self._refresh_lock:
+            if not self.needs_soft_refresh():
+                return
+            if self._async_client is None:
+                self._async_client = httpx.AsyncClient(timeout=10)
+            try:
+                response = await self._async_client.get(
+                    self.jwks_url, headers=self._conditional_headers()
+                )
+                self._apply_jwks_response(response)
+            except httpx.HTTPError:
+                # Keep serving the stale keys; a later attempt may succeed
+                pass
+
+    def schedule_refresh(self) -> None:
+        """Kick off refresh_jwks_async as a background task, at most one
+        at a time, keeping a strong reference until it completes."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        task = asyncio.create_task(self.refresh_jwks_async())
+        self._refresh_task = task
+        task.add_done_callback(self._on_refresh_done)
+
+    def _on_refresh_done(self, task: "asyncio.Task") -> None:
+        self._refresh_task = None
+        # refresh_jwks_async swallows expected fetch errors itself; log
+        # anything else instead of letting the task drop it silently
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background JWKS refresh failed: %r", task.exception())
+
+    @staticmethod
+    def _parse_max_age(cache_control: str) -> int:
+        """Pull max-age out of a Cache-Control header, 0 if absent/garbled."""
+        for directive in cache_control.split(','):
+            directive = directive.strip()
+            if directive.startswith('max-age='):
+                try:
+                    return int(directive[8:])
+                except ValueError:
+                    return 0
+        return 0
+
+    @property
+    def _jwks_ttl(self) -> float:
+        """Effective TTL: at least our static TTL, longer if the IdP says so."""
+        return max(self.JWKS_TTL, self._max_age)
+
+    def get_signing_key(self, token_header: Dict):
         """
         Find the right public key for this token
-        
+
         JWTs specify which key was used to sign them in the 'kid' header.
-        We need to find that key in the JWKS to verify the signature.
+        We look that key up in our prepared {kid: key} index, refreshing
+        the JWKS when the cache is stale or when we see an unknown kid
+        (which usually means key rotation happened).
         """
         if 'kid' not in token_header:
             raise HTTPException(
                 status_code=401,
                 detail="Token missing key ID (kid) - invalid JWT format"
             )
-        
-        jwks = self.get_jwks()
-        
-        # Find the key that matches this token's key ID
-        for key in jwks.get('keys', []):
-            if key['kid'] == token_header['kid']:
-                # Convert the JWK to PEM format for PyJWT
-                return jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
-        
+
+        kid = token_header['kid']
+
+        # Only refresh synchronously when we have nothing usable - a merely
+        # soft-stale cache is served as-is while the background task
+        # revalidates it off the request path.
+        if self._is_hard_expired():
+            self._refresh_jwks()
+
+        key = self._keys_by_kid.get(kid)
+        if key is not None:
+            return key
+
+        # Unknown kid - allow a single refresh in case keys just rotated
+        if time.monotonic() - self._fetched_at > 1.0:
+            self._refresh_jwks()
+            key = self._keys_by_kid.get(kid)
+            if key is not None:
+                return key
+
         # If we get here, the token was signed with a key we don't know about
         # This could mean key rotation happened, or it's a malicious token
         raise HTTPException(
@@ -117,6 +320,27 @@ class JWTValidator:
             detail="Unable to find appropriate signing key for token"
         )
     
+    def lookup_cached_payload(self, cache_key: bytes) -> Optional[Dict]:
+        """Return the cached verified payload for this key if still live.
+
+        Called from both the event loop and threadpool workers, so a
+        racing request may evict the entry between our get and the
+        bookkeeping below - tolerate the key vanishing rather than
+        letting a KeyError 500 the auth path.
+        """
+        cached = self._payload_cache.get(cache_key)
+        if cached is None:
+            return None
+        payload, exp = cached
+        if time.time() < exp:
+            try:
+                self._payload_cache.move_to_end(cache_key)
+            except KeyError:
+                pass
+            return payload
+        self._payload_cache.pop(cache_key, None)
+        return None
+
     def validate_token(self, token: str) -> Dict:
         """
         The main event - validate a JWT token completely
@@ -127,42 +351,76 @@ class JWTValidator:
         - Issuer check (make sure it came from Auth0)
         - Audience check (make sure it's for our API)
         """
-        # Validate configuration before proceeding
-        if not self.issuer:
-            raise HTTPException(
-                status_code=500,
-                detail=(
-                    "Auth configuration error: AUTH0_DOMAIN is missing; cannot construct issuer/JWKS URL."
-                ),
-            )
-        if not self.audience:
-            raise HTTPException(
-                status_code=500,
-                detail=(
-                    "Auth configuration error: AUTH0_AUDIENCE is not set. "
-                    "Configure it to the API Identifier from Auth0 (e.g. https://your-api)."
-                ),
-            )
+        # Configuration was checked once at construction - one branch here
+        if self._config_error:
+            raise HTTPException(status_code=500, detail=self._config_error)
+
+        # Fast path: we've already verified this exact token and its exp
+        # hasn't passed yet. blake2b is only a cache key here - the payload
+        # stored against it went through full signature verification.
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        cached = self.lookup_cached_payload(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            # First, decode the header without verification to get the key ID
-            # This is safe because we're not trusting the payload yet
-            unverified_header = jwt.get_unverified_header(token)
-            
+            # Decode the header segment ourselves to get the key ID.
+            # jwt.get_unverified_header would base64+JSON parse the header a
+            # second time on top of jwt.decode - one pass is enough. This is
+            # safe because we're not trusting the payload yet.
+            header_segment = token.split('.', 1)[0]
+            try:
+                padded = header_segment + '=' * (-len(header_segment) % 4)
+                unverified_header = json.loads(base64.urlsafe_b64decode(padded))
+            except (binascii.Error, ValueError, UnicodeDecodeError):
+                raise jwt.DecodeError("Invalid header segment")
+            if not isinstance(unverified_header, dict):
+                raise jwt.DecodeError("Invalid header segment")
+
             # Get the public key for signature verification
             signing_key = self.get_signing_key(unverified_header)
-            
-            # Now decode and verify everything
-            # This will raise an exception if anything is wrong
-            payload = jwt.decode(
-                token,
-                signing_key,
-                algorithms=['RS256'],  # Auth0 uses RS256
-                audience=self.audience,
-                issuer=self.issuer,
-                # Adding some leeway for clock skew between servers
-                leeway=30  # 30 seconds tolerance
+
+            # Verify the signature, then check the three claims we require
+            # inline. This skips jwt.decode's per-call options handling and
+            # full claim-validator walk - our issuer and audience never
+            # change within a process.
+            decoded = self._jws.decode_complete(
+                token, key=signing_key, algorithms=self._algorithms
             )
-            
+            payload = json.loads(decoded['payload'])
+
+            exp = payload.get('exp')
+            if exp is None:
+                raise jwt.MissingRequiredClaimError('exp')
+            # Adding some leeway for clock skew between servers
+            if exp + 30 < time.time():  # 30 seconds tolerance
+                raise jwt.ExpiredSignatureError("Signature has expired")
+
+            # jwt.decode also rejected tokens before their not-before
+            # time when the claim is present - keep that, same leeway
+            nbf = payload.get('nbf')
+            if nbf is not None and nbf - 30 > time.time():
+                raise jwt.ImmatureSignatureError("The token is not yet valid (nbf)")
+
+            if payload.get('iss') != self.issuer:
+                raise jwt.InvalidIssuerError("Invalid issuer")
+
+            aud = payload.get('aud')
+            if aud is None:
+                raise jwt.MissingRequiredClaimError('aud')
+            # Auth0 may issue a list of audiences
+            if aud != self.audience and not (
+                isinstance(aud, list) and self.audience in aud
+            ):
+                raise jwt.InvalidAudienceError("Invalid audience")
+
+            # Remember the verified payload until the token itself expires
+            exp = payload.get('exp')
+            if exp:
+                self._payload_cache[cache_key] = (payload, exp)
+                if len(self._payload_cache) > self.PAYLOAD_CACHE_SIZE:
+                    self._payload_cache.popitem(last=False)
+
             return payload
             
         except jwt.ExpiredSignatureError:
@@ -222,14 +480,14 @@ jwt_validator = JWTValidator(
 )
 
 if AUTH_DEBUG:
-    # Lightweight debug to confirm we constructed the correct issuer and JWKS URL
-    try:
-        dbg_domain = jwt_validator.domain or "<empty>"
-        dbg_aud = jwt_validator.audience or "<empty>"
-        print(f"[AUTH DEBUG] AUTH0_DOMAIN={dbg_domain} AUTH0_AUDIENCE={dbg_aud}")
-        print(f"[AUTH DEBUG] Issuer={jwt_validator.issuer} JWKS={jwt_validator.jwks_url}")
-    except Exception as _:
-        pass
+    # Lightweight debug to confirm we constructed the correct issuer and JWKS URL.
+    # Routed through logging so deployments at the default level pay nothing.
+    logger.debug(
+        "AUTH0_DOMAIN=%s AUTH0_AUDIENCE=%s",
+        jwt_validator.domain or "<empty>",
+        jwt_validator.audience or "<empty>",
+    )
+    logger.debug("Issuer=%s JWKS=%s", jwt_validator.issuer, jwt_validator.jwks_url)
 
 def extract_bearer_token(request: Request) -> Optional[str]:
     """
@@ -239,15 +497,17 @@ def extract_bearer_token(request: Request) -> Optional[str]:
     Authorization: Bearer <token>
     """
     authorization = request.headers.get('Authorization')
-    if not authorization:
+    if authorization is None:
         return None
-    
-    # Check if it's a Bearer token
-    if not authorization.startswith('Bearer '):
+
+    # removeprefix is a single C call; a length compare tells us whether
+    # the prefix was actually stripped. (Identity would also work on
+    # CPython, but same-object return is an implementation detail, not a
+    # language guarantee.)
+    token = authorization.removeprefix('Bearer ')
+    if len(token) == len(authorization):
         return None
-    
-    # Extract just the token part
-    return authorization[7:]  # Remove "Bearer " prefix
+    return token
 
 async def validate_jwt_token(request: Request) -> Dict:
     """
@@ -257,12 +517,25 @@ async def validate_jwt_token(request: Request) -> Dict:
     It extracts and validates the JWT, returning the user claims.
     """
     token = extract_bearer_token(request)
-    
+
     if not token:
         raise HTTPException(
             status_code=401,
             detail="Missing Authorization header with Bearer token"
         )
-    
-    # Validate the token and return the claims
-    return jwt_validator.validate_token(token)
\ No newline at end of file
+
+    # Kick off a background JWKS refresh when the cache goes soft-stale,
+    # so no request ever waits on the fetch itself
+    if jwt_validator.needs_soft_refresh():
+        jwt_validator.schedule_refresh()
+
+    # Cache hits resolve right here on the event loop - just a dict lookup.
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = jwt_validator.lookup_cached_payload(cache_key)
+    if payload is not None:
+        return payload
+
+    # Full validation does RSA math (and possibly a blocking JWKS fetch on
+    # a cold cache), so run it in the threadpool rather than serializing
+    # every concurrent request behind the event loop.
+    return await run_in_threadpool(jwt_validator.validate_token, token)
\ No newline at end of file
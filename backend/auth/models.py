@@ -1,134 +1,182 @@
 """
 Authentication Models
 
-Pydantic models for handling authenticated user data.
-These models structure the user information we extract from JWT tokens.
+Models for handling authenticated user data, structured from JWT claims.
+
+AuthenticatedUser is deliberately a plain slots dataclass rather than a
+Pydantic model: it's rebuilt on every authenticated request from claims
+that already went through JWT validation, so paying Pydantic's field
+validation and coercion per request bought us nothing. A slots instance
+is also a fraction of the allocation of a BaseModel.
 """
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
-from auth.scopes import UserRole, determine_user_role, parse_smart_scopes
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Pattern
+from auth.scopes import (
+    ROLE_CLINICIAN,
+    ROLE_PATIENT,
+    ROLE_UNKNOWN,
+    determine_user_role,
+    parse_smart_scopes,
+)
+
+# Above this many wildcard prefixes, a single compiled alternation beats a
+# Python-level prefix loop (the regex engine does the scan in C). Typical
+# tokens carry zero or one wildcard, so the loop stays the common path.
+_PREFIX_RE_THRESHOLD = 4
 
-class AuthenticatedUser(BaseModel):
+@dataclass(slots=True, frozen=True)
+class AuthenticatedUser:
     """
     Represents an authenticated user with SMART on FHIR context
-    
+
     This model captures everything we need to know about a user
-    for authorization decisions. I'm using Pydantic because it
-    gives us validation and easy JSON serialization.
+    for authorization decisions.
     """
-    
+
     # Basic user identity (from OpenID Connect)
-    user_id: str = Field(..., description="Unique user identifier (sub claim)")
-    email: Optional[str] = Field(None, description="User's email address")
-    name: Optional[str] = Field(None, description="User's display name")
-    
+    user_id: str
+    email: Optional[str] = None
+    name: Optional[str] = None
+
     # FHIR-specific identity
-    fhir_user: Optional[str] = Field(None, description="FHIR User resource reference")
-    
-    # Authorization context
-    scopes: List[str] = Field(default_factory=list, description="SMART on FHIR scopes")
-    role: UserRole = Field(default=UserRole.UNKNOWN, description="Derived user role")
-    
+    fhir_user: Optional[str] = None
+
+    # Authorization context. role is a plain string (see UserRole in
+    # auth.scopes for the documented values) to keep per-request reads free
+    # of enum descriptor overhead.
+    scopes: List[str] = field(default_factory=list)
+    role: str = ROLE_UNKNOWN
+
     # Patient context (if applicable)
-    patient_id: Optional[str] = Field(None, description="Patient context for patient-scoped access")
-    encounter_id: Optional[str] = Field(None, description="Encounter context")
-    
+    patient_id: Optional[str] = None
+    encounter_id: Optional[str] = None
+
     # Original JWT claims (for debugging)
-    raw_claims: Dict[str, Any] = Field(default_factory=dict, description="Original JWT payload")
-    
+    raw_claims: Dict[str, Any] = field(default_factory=dict)
+
+    # Precomputed lookup structures so per-request scope checks are set
+    # membership instead of a linear scan with string ops. Built once at
+    # construction; scopes never change for the lifetime of a token.
+    _exact_scopes: frozenset = field(init=False, repr=False, default=frozenset())
+    _wildcard_prefixes: tuple = field(init=False, repr=False, default=())
+    _prefix_re: Optional[Pattern] = field(init=False, repr=False, default=None)
+
+    # The two access questions /query asks on every request, answered once
+    # at construction instead of per call
+    has_patient_read: bool = field(init=False, default=False)
+    has_user_read: bool = field(init=False, default=False)
+
+    # Read scopes shown in the /query response, filtered once here rather
+    # than by a comprehension over scopes on every request
+    read_scopes: List[str] = field(init=False, repr=False, default_factory=list)
+
+    def __post_init__(self) -> None:
+        # frozen=True blocks normal assignment, so go through object
+        object.__setattr__(self, '_exact_scopes', frozenset(self.scopes))
+        # "patient/*.read" covers anything starting with "patient/", same
+        # for the broader "*.*" form - collect those prefixes up front
+        prefixes = tuple(
+            {s[:-6] for s in self.scopes if s.endswith('*.read')}
+            | {s[:-3] for s in self.scopes if s.endswith('*.*')}
+        )
+        object.__setattr__(self, '_wildcard_prefixes', prefixes)
+        # Scope-heavy tokens (enterprise SMART deployments) get a compiled
+        # alternation so each check is one C-level match, not a Python loop
+        if len(prefixes) > _PREFIX_RE_THRESHOLD:
+            object.__setattr__(self, '_prefix_re', re.compile(
+                '|'.join(re.escape(p) for p in prefixes)
+            ))
+        object.__setattr__(self, 'has_patient_read', self.has_scope('patient/*.read'))
+        object.__setattr__(self, 'has_user_read', self.has_scope('user/*.read'))
+        object.__setattr__(self, 'read_scopes', [s for s in self.scopes if 'read' in s])
+
     @classmethod
     def from_jwt_claims(cls, claims: Dict[str, Any]) -> "AuthenticatedUser":
         """
         Create AuthenticatedUser from JWT token claims
-        
+
         This is the main factory method for converting Auth0 JWT tokens
         into our internal user representation. I'm mapping the standard
         OpenID Connect claims to our model.
         """
-        
-        # Extract basic user info
-        user_id = claims.get('sub', '')
-        email = claims.get('email')
-        name = claims.get('name')
-        
-        # Extract FHIR-specific claims
-        fhir_user = claims.get('fhirUser')
-        
+
         # Parse scopes from the token
-        scope_string = claims.get('scope', '')
-        scopes = parse_smart_scopes(scope_string)
-        
-        # Determine user role from scopes
-        role = determine_user_role(scopes)
-        
-        # Extract patient context if present
-        # This would come from a SMART launch sequence
-        patient_id = claims.get('patient')
-        encounter_id = claims.get('encounter')
-        
+        scopes = parse_smart_scopes(claims.get('scope', ''))
+
         return cls(
-            user_id=user_id,
-            email=email,
-            name=name,
-            fhir_user=fhir_user,
+            user_id=claims.get('sub', ''),
+            email=claims.get('email'),
+            name=claims.get('name'),
+            fhir_user=claims.get('fhirUser'),
             scopes=scopes,
-            role=role,
-            patient_id=patient_id,
-            encounter_id=encounter_id,
-            raw_claims=claims
+            # Determine user role from scopes
+            role=determine_user_role(scopes),
+            # Patient context would come from a SMART launch sequence
+            patient_id=claims.get('patient'),
+            encounter_id=claims.get('encounter'),
+            raw_claims=claims,
         )
-    
+
     def has_scope(self, required_scope: str) -> bool:
         """
         Check if this user has a specific scope
-        
-        Convenience method that wraps the scope checking logic.
+
+        Uses the precomputed exact-scope set and wildcard prefixes, so
+        this is O(1) for direct matches and one prefix check per wildcard
+        scope the user holds (usually zero or one).
         """
-        from auth.scopes import has_scope
-        return has_scope(self.scopes, required_scope)
-    
+        if required_scope in self._exact_scopes:
+            return True
+        if self._prefix_re is not None:
+            return self._prefix_re.match(required_scope) is not None
+        return any(required_scope.startswith(p) for p in self._wildcard_prefixes)
+
     def can_access_resource(self, resource_type: str, operation: str = 'read') -> bool:
         """
         Check if user can access a FHIR resource type
-        
+
         This is the main authorization check that endpoints will use.
         """
-        from auth.scopes import validate_fhir_access
-        return validate_fhir_access(self.scopes, resource_type, operation)
-    
+        return (
+            self.has_scope(f"patient/{resource_type}.{operation}")
+            or self.has_scope(f"user/{resource_type}.{operation}")
+            or self.has_scope(f"system/{resource_type}.{operation}")
+        )
+
     def get_data_filter_context(self) -> Dict[str, Any]:
         """
         Get context for filtering data based on user permissions
-        
+
         This returns information that can be used to filter FHIR
         queries based on the user's authorized scope of access.
-        
+
         For example, if user has patient/*.read with patient_id="123",
         we should only return data for that patient.
         """
         context = {
-            'role': self.role.value,
+            'role': self.role,
             'scopes': self.scopes,
             'patient_id': self.patient_id,
             'encounter_id': self.encounter_id
         }
-        
+
         # Add scope-specific filters
-        if self.role == UserRole.PATIENT and self.patient_id:
+        if self.role == ROLE_PATIENT and self.patient_id:
             # Patient users should only see their own data
             context['filter_patient'] = self.patient_id
-        elif self.role == UserRole.CLINICIAN:
+        elif self.role == ROLE_CLINICIAN:
             # Clinicians might have broader access
             # In a real app, this would be based on their organization/department
             context['filter_organization'] = None  # No restriction for demo
-        
+
         return context
-    
+
     def to_response_dict(self) -> Dict[str, Any]:
         """
         Convert to a dictionary safe for API responses
-        
+
         This strips out sensitive information and formats the user
         data for returning to the frontend.
         """
@@ -136,8 +184,8 @@ class AuthenticatedUser(BaseModel):
             'user_id': self.user_id,
             'email': self.email,
             'name': self.name,
-            'role': self.role.value,
+            'role': self.role,
             'scopes': [scope for scope in self.scopes if 'read' in scope or 'fhir' in scope],
             'fhir_user': self.fhir_user,
             'patient_context': self.patient_id is not None
-        }
\ No newline at end of file
+        }
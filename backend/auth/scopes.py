@@ -51,15 +51,26 @@ class SmartScope(Enum):
 class UserRole(Enum):
     """
     User roles mapped from SMART scopes
-    
-    I'm simplifying the complex world of healthcare roles into 
+
+    I'm simplifying the complex world of healthcare roles into
     a few categories that make sense for this demo.
+
+    This enum documents the role values for API schemas; internally the
+    role travels as a plain string (see ROLE_* constants) because enum
+    member access and .value go through the descriptor protocol on every
+    request, which is wasted work for what is just a label.
     """
     PATIENT = "patient"        # Has patient/*.read scopes
     CLINICIAN = "clinician"    # Has user/*.read scopes
     SYSTEM = "system"          # Has system/*.read scopes
     UNKNOWN = "unknown"        # Doesn't fit our categories
 
+# Plain-string role constants used on the hot path
+ROLE_PATIENT = UserRole.PATIENT.value
+ROLE_CLINICIAN = UserRole.CLINICIAN.value
+ROLE_SYSTEM = UserRole.SYSTEM.value
+ROLE_UNKNOWN = UserRole.UNKNOWN.value
+
 def parse_smart_scopes(scope_string: Optional[str]) -> List[str]:
     """
     Parse space-separated scope string into list
@@ -71,46 +82,53 @@ def parse_smart_scopes(scope_string: Optional[str]) -> List[str]:
     """
     if not scope_string:
         return []
-    
-    # Split on spaces and filter out empty strings
-    scopes = [scope.strip() for scope in scope_string.split(' ') if scope.strip()]
-    return scopes
 
-def determine_user_role(scopes: List[str]) -> UserRole:
+    # split() with no argument handles runs of any whitespace and drops
+    # empty tokens in C - no per-token strip needed
+    return scope_string.split()
+
+def determine_user_role(scopes: List[str]) -> str:
     """
     Figure out what kind of user this is based on their scopes
-    
+
     This is my business logic for mapping SMART scopes to roles.
     In a real app, you might get roles from the identity provider directly.
+    Returns the plain role string - see the UserRole docstring for why.
     """
-    
+
     # Check for system scopes first (most privileged)
     if any(scope.startswith('system/') for scope in scopes):
-        return UserRole.SYSTEM
-    
+        return ROLE_SYSTEM
+
     # Check for user scopes (clinician access)
     if any(scope.startswith('user/') for scope in scopes):
-        return UserRole.CLINICIAN
-    
+        return ROLE_CLINICIAN
+
     # Check for patient scopes (patient access)
     if any(scope.startswith('patient/') for scope in scopes):
-        return UserRole.PATIENT
-    
-    return UserRole.UNKNOWN
+        return ROLE_PATIENT
 
-def check_required_scopes(user_scopes: List[str], required_scopes: List[str]) -> bool:
+    return ROLE_UNKNOWN
+
+def check_required_scopes(user_scopes: List[str], required_scopes) -> bool:
     """
     Check if user has all required scopes
-    
+
     This implements the "minimum necessary" principle for HIPAA.
     Users only get access to data they're authorized for.
+
+    Exact matches are resolved with one hashed subset check; only when
+    that fails do we fall back to the wildcard-aware per-scope matching.
     """
-    
-    for required_scope in required_scopes:
-        if not has_scope(user_scopes, required_scope):
-            return False
-    
-    return True
+
+    user_scope_set = (
+        user_scopes if isinstance(user_scopes, (set, frozenset))
+        else frozenset(user_scopes)
+    )
+    if user_scope_set.issuperset(required_scopes):
+        return True
+
+    return all(has_scope(user_scopes, scope) for scope in required_scopes)
 
 def has_scope(user_scopes: List[str], required_scope: str) -> bool:
     """
@@ -170,35 +188,39 @@ def require_scopes(required_scopes: List[str]):
         return func
     return decorator
 
+# The resource/context/scope combinations checked by
+# get_accessible_resources never change, so build the scope strings once
+# at import instead of formatting 15 f-strings per call.
+FHIR_RESOURCES = ['Patient', 'Condition', 'Observation', 'Encounter', 'Procedure']
+
+_ACCESS_TABLE = [
+    (context, resource, f"{prefix}/{resource}.read")
+    for prefix, context in [
+        ('patient', 'patient_context'),
+        ('user', 'user_context'),
+        ('system', 'system_context'),
+    ]
+    for resource in FHIR_RESOURCES
+]
+
 def get_accessible_resources(user_scopes: List[str]) -> Dict[str, List[str]]:
     """
     Return what FHIR resources this user can access
-    
+
     This is useful for debugging and showing users their permissions.
     I'm only checking the main resource types for this demo.
     """
-    
+
     resources = {
         'patient_context': [],
         'user_context': [],
         'system_context': []
     }
-    
-    fhir_resources = ['Patient', 'Condition', 'Observation', 'Encounter', 'Procedure']
-    
-    for resource in fhir_resources:
-        # Check patient context access
-        if has_scope(user_scopes, f"patient/{resource}.read"):
-            resources['patient_context'].append(resource)
-        
-        # Check user context access  
-        if has_scope(user_scopes, f"user/{resource}.read"):
-            resources['user_context'].append(resource)
-            
-        # Check system context access
-        if has_scope(user_scopes, f"system/{resource}.read"):
-            resources['system_context'].append(resource)
-    
+
+    for context, resource, scope in _ACCESS_TABLE:
+        if has_scope(user_scopes, scope):
+            resources[context].append(resource)
+
     return resources
 
 def create_scope_error_message(missing_scopes: List[str]) -> str:
@@ -214,8 +236,9 @@ def create_scope_error_message(missing_scopes: List[str]) -> str:
     else:
         return f"Missing required scopes: {', '.join(missing_scopes)}"
 
-# Common scope combinations for easy reuse
-PATIENT_READ_SCOPES = ["patient/*.read"]
-USER_READ_SCOPES = ["user/*.read"] 
-CLINICIAN_SCOPES = ["user/*.read", "launch/patient"]
-SYSTEM_SCOPES = ["system/*.read"]
\ No newline at end of file
+# Common scope combinations for easy reuse. Frozen sets: hashed lookups,
+# immutable, and allocated exactly once at import.
+PATIENT_READ_SCOPES = frozenset({"patient/*.read"})
+USER_READ_SCOPES = frozenset({"user/*.read"})
+CLINICIAN_SCOPES = frozenset({"user/*.read", "launch/patient"})
+SYSTEM_SCOPES = frozenset({"system/*.read"})
\ No newline at end of file
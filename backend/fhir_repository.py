@@ -8,16 +8,34 @@ This module lets me swap where FHIR data comes from:
 I keep a tiny interface so the rest of the app doesn't care which source we use.
 """
 
-from typing import Dict, Optional
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+import functools
 import os
-import requests
+import time
+import httpx
+import orjson
 
 # Basic config via env
 FHIR_SERVER_TYPE = os.getenv("FHIR_SERVER_TYPE", "mock").lower()  # mock | hapi
 FHIR_BASE_URL = os.getenv("FHIR_BASE_URL", "https://hapi.fhir.org/baseR4").rstrip("/")
 FHIR_TIMEOUT = int(os.getenv("FHIR_TIMEOUT_MS", "10000")) / 1000.0
 
+# Day-granular "today" cache: birthdate filters only care about the date,
+# so there's no need to allocate a fresh datetime + date per query. The
+# epoch-day check is a float division and an int compare.
+_today_cache: Tuple[int, int] = (-1, -1)  # (epoch_day, date_ordinal)
+
+def _today_ordinal() -> int:
+    global _today_cache
+    epoch_day = int(time.time() // 86400)
+    cached_day, ordinal = _today_cache
+    if epoch_day != cached_day:
+        ordinal = datetime.utcfromtimestamp(epoch_day * 86400).date().toordinal()
+        _today_cache = (epoch_day, ordinal)
+    return ordinal
+
+
 def compute_birthdate_filter_from_age(age_filter: Optional[Dict]) -> Optional[str]:
     """Translate an age filter into a FHIR birthDate search expression.
     Examples:
@@ -25,11 +43,24 @@ def compute_birthdate_filter_from_age(age_filter: Optional[Dict]) -> Optional[st
       lt 30 => birthdate=gtYYYY-MM-DD
       eq 40 => birthdate=geYYYY-MM-DD & leYYYY-MM-DD (40th birthday range)
       range 30..50 => birthdate between computed dates
+
+    Common filters (e.g. "over 65") repeat across requests, so the actual
+    date arithmetic and string building is memoized per (filter, day) -
+    including today's ordinal in the key makes the cache roll over daily.
     """
     if not age_filter:
         return None
 
-    today = datetime.utcnow().date()
+    return _birthdate_filter_cached(
+        tuple(sorted(age_filter.items())),
+        _today_ordinal(),
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _birthdate_filter_cached(age_filter_items: tuple, day_ordinal: int) -> Optional[str]:
+    age_filter = dict(age_filter_items)
+    today = date.fromordinal(day_ordinal)
     op = age_filter.get("operator")
 
     def date_for_years(years: int):
@@ -64,9 +95,13 @@ def compute_birthdate_filter_from_age(age_filter: Optional[Dict]) -> Optional[st
 
 
 class FhirRepository:
-    """Interface for FHIR data sources."""
+    """Interface for FHIR data sources.
 
-    def search(self, processed_query: Dict, user_context: Optional[Dict] = None) -> Dict:
+    search() is async so network-backed implementations don't block the
+    FastAPI event loop for the full upstream round trip.
+    """
+
+    async def search(self, processed_query: Dict, user_context: Optional[Dict] = None) -> Dict:
         raise NotImplementedError
 
 
@@ -75,7 +110,8 @@ class MockRepository(FhirRepository):
         import mock_data  # import from backend working directory
         self._mock = mock_data
 
-    def search(self, processed_query: Dict, user_context: Optional[Dict] = None) -> Dict:
+    async def search(self, processed_query: Dict, user_context: Optional[Dict] = None) -> Dict:
+        # In-memory data - nothing actually awaits here
         return self._mock.get_mock_data(processed_query, user_context=user_context or {})
 
 
@@ -89,60 +125,80 @@ class HapiFhirRepository(FhirRepository):
     def __init__(self, base_url: str, timeout: float):
         self.base = base_url.rstrip("/")
         self.timeout = timeout
-
-    def _get(self, path: str, params: Optional[Dict] = None) -> Dict:
-        url = f"{self.base}/{path.lstrip('/')}"
-        resp = requests.get(url, params=params or {}, timeout=self.timeout)
+        # Shared async client: keep-alive connections, and the event loop
+        # stays free while the HAPI round trip is in flight
+        self._client = httpx.AsyncClient(
+            base_url=self.base,
+            timeout=timeout,
+            # HTTP/2 multiplexes concurrent searches over one connection
+            http2=True,
+            transport=httpx.AsyncHTTPTransport(retries=2, http2=True),
+        )
+
+    async def _get(self, path: str, params: Optional[List[Tuple[str, str]]] = None) -> Dict:
+        # params as a sequence of pairs so repeated keys (e.g. two birthdate
+        # bounds for an age range) all make it onto the query string
+        resp = await self._client.get(f"/{path.lstrip('/')}", params=params or [])
         resp.raise_for_status()
-        return resp.json()
+        # FHIR bundles can be large; orjson decodes the raw bytes several
+        # times faster than stdlib json
+        return orjson.loads(resp.content)
 
-    def _patient_search(self, entities: Dict) -> Dict:
+    async def _patient_search(self, entities: Dict) -> Dict:
         age_filter = entities.get("age_filter")
-        params: Dict[str, str] = {}
+        params: List[Tuple[str, str]] = []
 
         # Age -> birthdate filter
         birthdate_q = compute_birthdate_filter_from_age(age_filter)
         if birthdate_q:
-            # birthdate_q can contain multiple birthdate params joined with &
+            # birthdate_q can contain multiple birthdate params joined with &;
+            # a dict would collapse them and break range queries
             for part in birthdate_q.split("&"):
                 k, v = part.split("=", 1)
-                params[k] = v
+                params.append((k, v))
 
         # Simple name search from NLP persons if any
         persons = (entities.get("spacy") or {}).get("persons") or []
         if persons:
-            params["name"] = persons[0]
+            params.append(("name", persons[0]))
 
-        return self._get("Patient", params)
+        return await self._get("Patient", params)
 
-    def _condition_search(self, entities: Dict) -> Dict:
-        params: Dict[str, str] = {}
+    async def _condition_search(self, entities: Dict) -> Dict:
+        params: List[Tuple[str, str]] = []
         conditions = entities.get("conditions") or []
         # Minimal demo: use text search on condition display if no codes
         if conditions:
-            params["_text"] = conditions[0]
-        return self._get("Condition", params)
+            params.append(("_text", conditions[0]))
+        return await self._get("Condition", params)
 
-    def _observation_search(self, entities: Dict) -> Dict:
-        params: Dict[str, str] = {"category": "vital-signs"}
-        return self._get("Observation", params)
+    async def _observation_search(self, entities: Dict) -> Dict:
+        params: List[Tuple[str, str]] = [("category", "vital-signs")]
+        return await self._get("Observation", params)
 
-    def search(self, processed_query: Dict, user_context: Optional[Dict] = None) -> Dict:
+    async def search(self, processed_query: Dict, user_context: Optional[Dict] = None) -> Dict:
         intent = processed_query.get("intent", "general_search")
         entities = (processed_query.get("entities") or {})
 
         if intent == "patient_search":
-            return self._patient_search(entities)
+            return await self._patient_search(entities)
         if intent == "condition_search":
-            return self._condition_search(entities)
+            return await self._condition_search(entities)
         if intent == "observation_search":
-            return self._observation_search(entities)
+            return await self._observation_search(entities)
 
         # Fallback: server capability statement to show connectivity
-        return self._get("metadata")
+        return await self._get("metadata")
 
 
+@functools.lru_cache(maxsize=4)
 def build_repository(repo_type: str) -> FhirRepository:
+    """Build (or reuse) the repository for a source type.
+
+    Memoized so per-request ?source= overrides reuse one repository
+    instance - and with it the HAPI client's keep-alive connection pool -
+    instead of constructing a fresh client per request.
+    """
     t = (repo_type or "").lower()
     if t == "hapi":
         return HapiFhirRepository(FHIR_BASE_URL, FHIR_TIMEOUT)
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from dotenv import load_dotenv
 load_dotenv()  # Load from CWD if present
@@ -5,22 +6,24 @@ _env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".env"))
 load_dotenv(dotenv_path=_env_path, override=False)
 
 from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ValidationError
 from nlp import process_query
 from fhir_repository import get_repository, build_repository
 from auth.middleware import validate_jwt_token
 from auth.models import AuthenticatedUser
-from auth.scopes import check_required_scopes, PATIENT_READ_SCOPES, USER_READ_SCOPES
 
 app = FastAPI(
     title="AI on FHIR API",
     description="Natural language query interface for FHIR data with SMART on FHIR authentication",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes our deeply nested FHIR bundles in C - markedly
+    # cheaper than the stdlib encoder on every response
+    default_response_class=ORJSONResponse,
 )
 
-repo = get_repository()
-
 # CORS setup - now including credentials for auth tokens
 # I need to allow credentials because we're using Bearer tokens
 app.add_middleware(
@@ -35,14 +38,24 @@ app.add_middleware(
 class QueryRequest(BaseModel):
     query: str
 
+
+@app.on_event("startup")
+async def _startup():
+    # Build the repository when the worker's event loop is up rather than
+    # at module import: the HAPI client construction runs off the loop in
+    # a thread, so workers become ready in parallel instead of serially
+    # blocking on bootstrap.
+    app.state.repo = await asyncio.to_thread(get_repository)
+
 @app.get("/")
 async def root():
     return {"message": "AI on FHIR API"}
 
 @app.get("/api/health")
-async def health():
+async def health(request: Request):
     try:
         # Report which repo is active and the base URL if HAPI
+        repo = request.app.state.repo
         repo_name = type(repo).__name__
         info = {"status": "ok", "data_source": repo_name}
         if repo_name == "HapiFhirRepository":
@@ -54,14 +67,13 @@ async def health():
 
 
 @app.post("/api/toggle-data-source")
-async def toggle_data_source(mode: str):
+async def toggle_data_source(mode: str, request: Request):
     """
     Switch the backend data source at runtime.
     mode: "mock" | "hapi"
     """
-    global repo
-    repo = build_repository(mode)
-    return {"status": "ok", "data_source": type(repo).__name__}
+    request.app.state.repo = build_repository(mode)
+    return {"status": "ok", "data_source": type(request.app.state.repo).__name__}
 
 @app.get("/api/user")
 async def get_user_info(jwt_claims: dict = Depends(validate_jwt_token)):
@@ -81,31 +93,53 @@ async def get_user_info(jwt_claims: dict = Depends(validate_jwt_token)):
         }
     }
 
-@app.post("/query")
+@app.post(
+    "/query",
+    # The body is parsed manually below, so document it explicitly -
+    # otherwise the endpoint shows up in OpenAPI with no request body
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": QueryRequest.model_json_schema()}},
+            "required": True,
+        }
+    },
+)
 async def query_endpoint(
-    request: QueryRequest,
+    request: Request,
     jwt_claims: dict = Depends(validate_jwt_token),
     source: str | None = None,
 ):
     """
     Process natural language query and return filtered FHIR data
-    
+
     NOW WITH AUTHENTICATION! 🔒
-    
+
     This endpoint now requires a valid JWT token with appropriate SMART scopes.
     I'm checking for either patient/*.read or user/*.read permissions.
     """
+    # Parse and validate the body in one pass: model_validate_json runs
+    # Pydantic v2's jiter parser directly over the raw bytes, instead of a
+    # stdlib json parse followed by a second validation of the dict.
+    try:
+        query_request = QueryRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        # Re-raise through FastAPI's own validation exception so the 422
+        # shape matches a declared body (including the leading "body" in
+        # loc) and the errors run through jsonable_encoder - a raw
+        # HTTPException(detail=e.errors()) 500s on unserializable error
+        # context like the bytes input of a JSON parse failure.
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        )
+
     try:
         # Create user object from JWT claims
         user = AuthenticatedUser.from_jwt_claims(jwt_claims)
         
         # Check if user has required SMART scopes for FHIR data access
-        # They need either patient-level or user-level read access
-        required_scopes = PATIENT_READ_SCOPES + USER_READ_SCOPES  # Either one is fine
-        has_patient_access = check_required_scopes(user.scopes, PATIENT_READ_SCOPES)
-        has_user_access = check_required_scopes(user.scopes, USER_READ_SCOPES)
-        
-        if not (has_patient_access or has_user_access):
+        # They need either patient-level or user-level read access -
+        # both answers were precomputed when the user object was built
+        if not (user.has_patient_read or user.has_user_read):
             # User doesn't have the right SMART scopes
             raise HTTPException(
                 status_code=403,
@@ -113,20 +147,20 @@ async def query_endpoint(
             )
         
         # Parse the natural language query
-        processed = process_query(request.query)
+        processed = process_query(query_request.query)
         
         # Optionally switch source per-request via querystring ?source=hapi|mock
-        active_repo = repo if not source else build_repository(source)
+        active_repo = request.app.state.repo if not source else build_repository(source)
         # Fetch FHIR data from the selected repository (mock or HAPI)
-        fhir_data = active_repo.search(processed, user_context=user.get_data_filter_context())
+        fhir_data = await active_repo.search(processed, user_context=user.get_data_filter_context())
         
         # Return structured response with user context
         return {
-            "query": request.query,
+            "query": query_request.query,
             "user_context": {
                 "user_id": user.user_id,
-                "role": user.role.value,
-                "scopes": [s for s in user.scopes if 'read' in s]  # Only show relevant scopes
+                "role": user.role,
+                "scopes": user.read_scopes  # Only show relevant scopes
             },
             "nlp_analysis": {
                 "intent": processed.get("intent"),
@@ -142,4 +176,15 @@ async def query_endpoint(
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Multiple workers for process-level parallelism around the GIL, uvloop
+    # for a libuv event loop, httptools for C-level HTTP parsing. Workers
+    # need the import string (not the app object) to fork cleanly;
+    # WEB_CONCURRENCY overrides the heuristic in containerized deploys.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.environ.get("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1)),
+        loop="uvloop",
+        http="httptools",
+    )
\ No newline at end of file
@@ -1,5 +1,101 @@
-from datetime import datetime, timedelta
-import random
+from dataclasses import dataclass, field
+from datetime import date, datetime
+import functools
+import re
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional - NumPy masks remain the fallback
+    njit = None
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional - the naive scan remains
+    ahocorasick = None
+
+# Below this many search terms, building the automaton costs more than
+# the naive any()-scan it replaces
+_AC_MIN_TERMS = 3
+
+# Operator codes for the JIT-compiled filter (plain ints so the compiled
+# function never touches Python strings)
+_AGE_OPS = {"gt": 0, "lt": 1, "eq": 2, "range": 3}
+
+if njit is not None:
+    @njit(cache=True)
+    def _filter_ages(ages, op, v, lo, hi):  # pragma: no cover - thin numeric kernel
+        out = np.empty(ages.shape[0], np.int64)
+        n = 0
+        for i in range(ages.shape[0]):
+            a = ages[i]
+            if op == 0:
+                keep = a > v
+            elif op == 1:
+                keep = a < v
+            elif op == 2:
+                keep = a == v
+            else:
+                keep = lo <= a <= hi
+            if keep:
+                out[n] = i
+                n += 1
+        return out[:n]
+
+    # Warm the JIT at import so the compile cost never lands on a request
+    _filter_ages(np.zeros(1, np.int32), 0, 0, 0, 0)
+else:
+    _filter_ages = None
+
+# Mock resources as frozen slots dataclasses rather than dicts: a slot
+# record is a fraction of a dict's footprint, attribute reads resolve by
+# slot offset instead of key hashing, and frozen instances are safe to
+# share between cached bundles.
+
+@dataclass(slots=True, frozen=True)
+class Patient:
+    id: str
+    name: str
+    birthDate: str
+    gender: str
+    age: int
+
+@dataclass(slots=True, frozen=True)
+class Condition:
+    id: str
+    patient: str
+    patientName: str
+    code: str
+    display: str
+    onsetDate: str
+    # Lowercased display, computed once so condition matching never
+    # re-lowercases per item per request
+    display_lc: str = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'display_lc', self.display.lower())
+
+@dataclass(slots=True, frozen=True)
+class Medication:
+    id: str
+    patient: str
+    medication: str
+    dosage: str
+    frequency: str
+
+@dataclass(slots=True, frozen=True)
+class Observation:
+    id: str
+    patient: str
+    type: str
+    # Readings and dates stay native (ints / datetime.date) on the
+    # record; orjson serializes dates in C, and the display string for
+    # the reading is composed once at bundle build, not per row here
+    systolic: int
+    diastolic: int
+    unit: str
+    date: date
 
 def calculate_age(birth_date_str: str) -> int:
     """Calculate age from birth date"""
@@ -9,189 +105,340 @@ def calculate_age(birth_date_str: str) -> int:
     return age
 
 def filter_by_age(patients: list, age_filter: dict) -> list:
-    """Filter patients by age criteria"""
+    """Filter patients by age criteria
+
+    When filtering the full roster, ages live in a columnar int32 array
+    alongside the patient list, so the compare is one vectorized NumPy
+    mask rather than a Python loop - the win grows with roster size.
+    Pre-filtered subsets (e.g. after a patient-context filter) fall back
+    to scalar comprehensions over the precomputed age field.
+    """
     if not age_filter:
         return patients
-    
-    filtered = []
-    for patient in patients:
-        age = calculate_age(patient["birthDate"])
-        
-        if age_filter["operator"] == "gt":
-            if age > age_filter["value"]:
-                filtered.append(patient)
-        elif age_filter["operator"] == "lt":
-            if age < age_filter["value"]:
-                filtered.append(patient)
-        elif age_filter["operator"] == "eq":
-            if age == age_filter["value"]:
-                filtered.append(patient)
-        elif age_filter["operator"] == "range":
-            if age_filter["min"] <= age <= age_filter["max"]:
-                filtered.append(patient)
-    
-    return filtered
+
+    op = age_filter["operator"]
+
+    day_ordinal = date.today().toordinal()
+    if patients is _patients_for_day(day_ordinal):
+        opcode = _AGE_OPS.get(op)
+        if opcode is None:
+            return []
+        ages = _patient_ages_for_day(day_ordinal)
+
+        if _filter_ages is not None:
+            # LLVM-compiled single pass with an index cursor
+            idx = _filter_ages(
+                ages, opcode,
+                age_filter.get("value", 0),
+                age_filter.get("min", 0),
+                age_filter.get("max", 0),
+            )
+            return [patients[i] for i in idx]
+
+        if opcode == 0:
+            mask = ages > age_filter["value"]
+        elif opcode == 1:
+            mask = ages < age_filter["value"]
+        elif opcode == 2:
+            mask = ages == age_filter["value"]
+        else:
+            mask = (ages >= age_filter["min"]) & (ages <= age_filter["max"])
+        return [patients[i] for i in np.nonzero(mask)[0]]
+
+    if op == "gt":
+        v = age_filter["value"]
+        return [p for p in patients if p.age > v]
+    if op == "lt":
+        v = age_filter["value"]
+        return [p for p in patients if p.age < v]
+    if op == "eq":
+        v = age_filter["value"]
+        return [p for p in patients if p.age == v]
+    if op == "range":
+        lo, hi = age_filter["min"], age_filter["max"]
+        return [p for p in patients if lo <= p.age <= hi]
+    return []
+
+def _substring_matcher(terms: list):
+    """Build a text -> bool predicate for "any term occurs in text".
+
+    With enough terms (and pyahocorasick installed) this compiles one
+    Aho-Corasick automaton, so every display is checked against all
+    terms in a single C-level pass over its characters instead of one
+    interpreter-level substring scan per term. Small term lists keep the
+    naive any()-scan, which is cheaper than automaton construction.
+    """
+    if ahocorasick is not None and len(terms) >= _AC_MIN_TERMS:
+        automaton = ahocorasick.Automaton()
+        for term in set(terms):
+            automaton.add_word(term, term)
+        automaton.make_automaton()
+        return lambda text: next(automaton.iter(text), None) is not None
+    return lambda text: any(term in text for term in terms)
 
 def filter_by_condition(data: list, conditions: list) -> list:
-    """Filter data by medical conditions"""
+    """Filter data by medical conditions
+
+    Query terms are lowercased once up front, and condition records carry
+    a precomputed _display_lc field so no display text is re-lowercased
+    inside the matching loop.
+    """
     if not conditions:
         return data
-    
-    filtered = []
-    for item in data:
-        display = item.get("display", "").lower()
-        if any(condition.lower() in display for condition in conditions):
-            filtered.append(item)
-    
-    return filtered
+
+    terms = [condition.lower() for condition in conditions]
+
+    # Index fast path when filtering the canonical condition tuple: resolve
+    # each term from the posting lists, substring-scanning only for terms
+    # the index doesn't know (e.g. partial words or multi-word phrases).
+    if data is _CONDITIONS:
+        matched = set()
+        fallback_terms = []
+        for term in terms:
+            hits = _COND_BY_TOKEN.get(term)
+            if hits is None:
+                fallback_terms.append(term)
+            else:
+                matched.update(id(c) for c in hits)
+        if fallback_terms:
+            matches = _substring_matcher(fallback_terms)
+            for item in data:
+                if id(item) not in matched and matches(item.display_lc):
+                    matched.add(id(item))
+        return [item for item in data if id(item) in matched]
+
+    matches = _substring_matcher(terms)
+    return [item for item in data if matches(item.display_lc)]
 
 def get_mock_data(processed_query: dict, user_context: dict = None):
     """
     Return FHIR-formatted data based on processed query with entity filtering
-    
+
     Now with user context! This lets me filter data based on the user's
     SMART on FHIR permissions and patient context.
+
+    Results are memoized on a canonical (intent, filters, patient) key, so
+    repeated identical queries - dashboards polling, demo traffic - hit the
+    cache instead of refiltering and rebuilding the bundle. Returned
+    bundles are shared, read-only objects.
     """
     intent = processed_query.get("intent", "unknown")
     entities = processed_query.get("entities", {})
     age_filter = entities.get("age_filter")
     conditions = entities.get("conditions", [])
-    
+
     # Get user context for authorization filtering
     # In a real FHIR server, this would constrain database queries
-    user_role = user_context.get("role", "unknown") if user_context else "unknown"
     patient_filter = user_context.get("filter_patient") if user_context else None
-    
-    if intent == "patient_search":
-        patients = generate_mock_patients()
-        
-        # Apply user-context filtering first (SMART on FHIR security)
-        if patient_filter:
-            # Patient-scoped access - only return specific patient
-            patients = [p for p in patients if p.get("id") == patient_filter]
-        
-        if age_filter:
-            patients = filter_by_age(patients, age_filter)
-        return to_fhir_bundle(patients, "Patient")
-    
-    elif intent == "condition_search":
-        condition_data = generate_mock_conditions()
-        
-        # Apply user-context filtering first (SMART on FHIR security)
-        if patient_filter:
-            # Patient-scoped access - only return conditions for specific patient
-            condition_data = [c for c in condition_data if c.get("patient_id") == patient_filter]
-        
-        if conditions:
-            condition_data = filter_by_condition(condition_data, conditions)
-        return to_fhir_bundle(condition_data, "Condition")
-    
-    elif intent == "medication_search":
-        medications = generate_mock_medications()
-        
-        # Apply user-context filtering first (SMART on FHIR security)
-        if patient_filter:
-            # Patient-scoped access - only return medications for specific patient
-            medications = [m for m in medications if m.get("patient_id") == patient_filter]
-            
-        return to_fhir_bundle(medications, "MedicationRequest")
-    
-    elif intent == "observation_search":
-        observations = generate_mock_observations()
-        
-        # Apply user-context filtering first (SMART on FHIR security)
-        if patient_filter:
-            # Patient-scoped access - only return observations for specific patient
-            observations = [o for o in observations if o.get("patient_id") == patient_filter]
-            
-        return to_fhir_bundle(observations, "Observation")
-    
-    else:
-        return {
-            "resourceType": "OperationOutcome",
-            "issue": [{
-                "severity": "information",
-                "code": "not-found",
-                "diagnostics": "No data available for this query"
+
+    return _get_mock_data_cached(
+        intent,
+        tuple(sorted(age_filter.items())) if age_filter else None,
+        tuple(sorted(conditions)) if conditions else (),
+        patient_filter,
+        # Patient results depend on today's ages, so the memo key rolls
+        # over at midnight like _patients_for_day itself
+        date.today().toordinal(),
+    )
+
+@functools.lru_cache(maxsize=256)
+def _get_mock_data_cached(intent, age_key, conditions_key, patient_filter, day_ordinal):
+    age_filter = dict(age_key) if age_key else None
+    conditions = list(conditions_key)
+    # Dict dispatch instead of re-comparing the intent string down an
+    # if/elif ladder; unknown intents fall through to the no-data outcome
+    handler = _INTENT_HANDLERS.get(intent, _no_data_search)
+    return handler(age_filter, conditions, patient_filter)
+
+def _patient_search(age_filter, conditions, patient_filter):
+    # Unfiltered fast path: serve the prebuilt (read-only) bundle
+    if not patient_filter and not age_filter:
+        return _patient_bundle_for_day(date.today().toordinal())
+
+    patients = generate_mock_patients()
+
+    # Apply user-context filtering first (SMART on FHIR security)
+    if patient_filter:
+        # Patient-scoped access - only return specific patient
+        patients = [p for p in patients if p.id == patient_filter]
+
+    if age_filter:
+        patients = filter_by_age(patients, age_filter)
+    return to_fhir_bundle(patients, "Patient")
+
+def _condition_search(age_filter, conditions, patient_filter):
+    # Unfiltered fast path: serve the prebuilt (read-only) bundle
+    if not patient_filter and not conditions:
+        return _CONDITION_BUNDLE
+
+    condition_data = generate_mock_conditions()
+
+    # Apply user-context filtering first (SMART on FHIR security)
+    if patient_filter:
+        # Patient-scoped access - only return conditions for specific patient
+        condition_data = [c for c in condition_data if c.patient == patient_filter]
+
+    if conditions:
+        condition_data = filter_by_condition(condition_data, conditions)
+    return to_fhir_bundle(condition_data, "Condition")
+
+def _medication_search(age_filter, conditions, patient_filter):
+    # Unfiltered fast path: serve the prebuilt (read-only) bundle
+    if not patient_filter:
+        return _MEDICATION_BUNDLE
+
+    medications = generate_mock_medications()
+
+    # Apply user-context filtering first (SMART on FHIR security)
+    # Patient-scoped access - only return medications for specific patient
+    medications = [m for m in medications if m.patient == patient_filter]
+
+    return to_fhir_bundle(medications, "MedicationRequest")
+
+def _observation_search(age_filter, conditions, patient_filter):
+    observations = generate_mock_observations()
+
+    # Apply user-context filtering first (SMART on FHIR security)
+    if patient_filter:
+        # Patient-scoped access - only return observations for specific patient
+        observations = [o for o in observations if o.patient == patient_filter]
+
+    return to_fhir_bundle(observations, "Observation")
+
+def _no_data_search(age_filter, conditions, patient_filter):
+    return {
+        "resourceType": "OperationOutcome",
+        "issue": [{
+            "severity": "information",
+            "code": "not-found",
+            "diagnostics": "No data available for this query"
+        }]
+    }
+
+_INTENT_HANDLERS = {
+    "patient_search": _patient_search,
+    "condition_search": _condition_search,
+    "medication_search": _medication_search,
+    "observation_search": _observation_search,
+}
+
+# Per-type resource builders, dispatched by a dict lookup instead of an
+# if/elif chain re-evaluated for every resource in a bundle.
+
+def _build_patient(resource: Patient) -> dict:
+    return {
+        "resourceType": "Patient",
+        "id": resource.id,
+        "name": [{
+            "use": "official",
+            "text": resource.name
+        }],
+        "gender": resource.gender,
+        "birthDate": resource.birthDate,
+        "extension": [{
+            "url": "http://hl7.org/fhir/StructureDefinition/patient-age",
+            "valueInteger": resource.age
+        }]
+    }
+
+def _build_condition(resource: Condition) -> dict:
+    return {
+        "resourceType": "Condition",
+        "id": resource.id,
+        "subject": {
+            "reference": f"Patient/{resource.patient}",
+            "display": resource.patientName
+        },
+        "code": {
+            "coding": [{
+                "system": "http://snomed.info/sct",
+                "code": resource.code,
+                "display": resource.display
             }]
+        },
+        "onsetDateTime": resource.onsetDate
+    }
+
+def _build_medication_request(resource: Medication) -> dict:
+    return {
+        "resourceType": "MedicationRequest",
+        "id": resource.id,
+        "subject": {
+            "reference": f"Patient/{resource.patient}"
+        },
+        "medicationCodeableConcept": {
+            "text": resource.medication
+        },
+        "dosageInstruction": [{
+            "text": f"{resource.dosage} {resource.frequency}"
+        }]
+    }
+
+def _build_observation(resource: Observation) -> dict:
+    return {
+        "resourceType": "Observation",
+        "id": resource.id,
+        "status": "final",
+        "subject": {
+            "reference": f"Patient/{resource.patient}"
+        },
+        "code": {
+            "text": resource.type
+        },
+        "valueQuantity": {
+            "value": f"{resource.systolic}/{resource.diastolic}",
+            "unit": resource.unit
+        },
+        # A date object: ORJSONResponse renders it as YYYY-MM-DD in C
+        "effectiveDateTime": resource.date
+    }
+
+def _make_bundle_builder(resource_type: str, build):
+    """Specialize a whole-bundle builder for one resource type.
+
+    The base URL and the resource builder are bound into the closure's
+    fast locals at import, so building a bundle is one function call and
+    one list comprehension - no per-call dispatch, f-string formatting or
+    envelope branching left on the request path.
+    """
+    base_url = f"http://example.com/fhir/{resource_type}/"
+
+    def build_bundle(resources: list) -> dict:
+        entries = [
+            {"fullUrl": base_url + r.id, "resource": build(r)}
+            for r in resources
+        ]
+        return {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "total": len(entries),
+            "entry": entries
         }
 
+    return build_bundle
+
+_BUNDLE_BUILDERS = {
+    resource_type: _make_bundle_builder(resource_type, build)
+    for resource_type, build in (
+        ("Patient", _build_patient),
+        ("Condition", _build_condition),
+        ("MedicationRequest", _build_medication_request),
+        ("Observation", _build_observation),
+    )
+}
+
 def to_fhir_bundle(resources: list, resource_type: str) -> dict:
     """Convert resources to FHIR Bundle format"""
-    entries = []
-    
-    for resource in resources:
-        if resource_type == "Patient":
-            fhir_resource = {
-                "resourceType": "Patient",
-                "id": resource["id"],
-                "name": [{
-                    "use": "official",
-                    "text": resource["name"]
-                }],
-                "gender": resource["gender"],
-                "birthDate": resource["birthDate"],
-                "extension": [{
-                    "url": "http://hl7.org/fhir/StructureDefinition/patient-age",
-                    "valueInteger": resource["age"]
-                }]
-            }
-        elif resource_type == "Condition":
-            fhir_resource = {
-                "resourceType": "Condition",
-                "id": resource["id"],
-                "subject": {
-                    "reference": f"Patient/{resource['patient']}",
-                    "display": resource["patientName"]
-                },
-                "code": {
-                    "coding": [{
-                        "system": "http://snomed.info/sct",
-                        "code": resource["code"],
-                        "display": resource["display"]
-                    }]
-                },
-                "onsetDateTime": resource["onsetDate"]
-            }
-        elif resource_type == "MedicationRequest":
-            fhir_resource = {
-                "resourceType": "MedicationRequest",
-                "id": resource["id"],
-                "subject": {
-                    "reference": f"Patient/{resource['patient']}"
-                },
-                "medicationCodeableConcept": {
-                    "text": resource["medication"]
-                },
-                "dosageInstruction": [{
-                    "text": f"{resource['dosage']} {resource['frequency']}"
-                }]
-            }
-        elif resource_type == "Observation":
-            fhir_resource = {
-                "resourceType": "Observation",
-                "id": resource["id"],
-                "status": "final",
-                "subject": {
-                    "reference": f"Patient/{resource['patient']}"
-                },
-                "code": {
-                    "text": resource["type"]
-                },
-                "valueQuantity": {
-                    "value": resource["value"],
-                    "unit": resource["unit"]
-                },
-                "effectiveDateTime": resource["date"]
-            }
-        else:
-            fhir_resource = resource
-        
-        entries.append({
-            "fullUrl": f"http://example.com/fhir/{resource_type}/{resource.get('id', 'unknown')}",
-            "resource": fhir_resource
-        })
-    
+    builder = _BUNDLE_BUILDERS.get(resource_type)
+    if builder is not None:
+        return builder(resources)
+
+    # Unknown types pass through untouched
+    base_url = f"http://example.com/fhir/{resource_type}/"
+    entries = [
+        {"fullUrl": base_url + str(r.get("id", "unknown")), "resource": r}
+        for r in resources
+    ]
     return {
         "resourceType": "Bundle",
         "type": "searchset",
@@ -199,124 +446,107 @@ def to_fhir_bundle(resources: list, resource_type: str) -> dict:
         "entry": entries
     }
 
-def generate_mock_patients():
+# Static patient roster; ages are derived per day in _patients_for_day
+_PATIENT_ROWS = (
+    ("P001", "Moloski Ajayi", "1985-03-15", "male"),
+    ("P002", "Dipo Ajayi", "1990-07-22", "female"),
+    ("P003", "Bob Johnson", "1978-11-30", "male"),
+    ("P004", "Mary Williams", "1965-05-12", "female"),
+    ("P005", "James Brown", "1955-09-20", "male"),
+    ("P006", "Sarah Davis", "2000-02-14", "female"),
+)
+
+@functools.lru_cache(maxsize=1)
+def _patients_for_day(day_ordinal: int) -> list:
+    """Build the patient dicts with precomputed ages, once per day.
+
+    Keying the cache on today's ordinal means ages stay correct across
+    midnight while every request within a day reuses the same list and
+    pays zero strptime calls.
+    """
     return [
-        {
-            "id": "P001",
-            "name": "Moloski Ajayi",
-            "birthDate": "1985-03-15",
-            "gender": "male",
-            "age": calculate_age("1985-03-15")
-        },
-        {
-            "id": "P002",
-            "name": "Dipo Ajayi",
-            "birthDate": "1990-07-22",
-            "gender": "female",
-            "age": calculate_age("1990-07-22")
-        },
-        {
-            "id": "P003",
-            "name": "Bob Johnson",
-            "birthDate": "1978-11-30",
-            "gender": "male",
-            "age": calculate_age("1978-11-30")
-        },
-        {
-            "id": "P004",
-            "name": "Mary Williams",
-            "birthDate": "1965-05-12",
-            "gender": "female",
-            "age": calculate_age("1965-05-12")
-        },
-        {
-            "id": "P005",
-            "name": "James Brown",
-            "birthDate": "1955-09-20",
-            "gender": "male",
-            "age": calculate_age("1955-09-20")
-        },
-        {
-            "id": "P006",
-            "name": "Sarah Davis",
-            "birthDate": "2000-02-14",
-            "gender": "female",
-            "age": calculate_age("2000-02-14")
-        }
+        Patient(id=pid, name=name, birthDate=bd, gender=gender, age=calculate_age(bd))
+        for pid, name, bd, gender in _PATIENT_ROWS
     ]
 
+@functools.lru_cache(maxsize=1)
+def _patient_ages_for_day(day_ordinal: int) -> "np.ndarray":
+    """Columnar age array aligned index-for-index with _patients_for_day."""
+    return np.array(
+        [p.age for p in _patients_for_day(day_ordinal)], dtype=np.int32
+    )
+
+def generate_mock_patients():
+    return _patients_for_day(date.today().toordinal())
+
+# Immutable reference data, allocated once at import. Callers treat these
+# (and anything built from them) as read-only.
+_CONDITIONS = (
+    Condition("C001", "P001", "Moloski Ajayi", "38341003", "Hypertension", "2020-01-15"),
+    Condition("C002", "P002", "Dipo Ajayi", "73211009", "Diabetes mellitus", "2019-06-10"),
+    Condition("C003", "P004", "Mary Williams", "73211009", "Diabetes mellitus", "2015-03-22"),
+    Condition("C004", "P005", "James Brown", "38341003", "Hypertension", "2010-07-18"),
+    Condition("C005", "P005", "James Brown", "195967001", "Asthma", "2008-11-05"),
+)
+
+_MEDICATIONS = (
+    Medication("M001", "P001", "Lisinopril", "10mg", "Once daily"),
+    Medication("M002", "P002", "Metformin", "500mg", "Twice daily"),
+)
+
+# Inverted index: display token -> conditions containing it. Exact disease
+# names ("diabetes", "hypertension") resolve via posting-list lookup with
+# no substring scanning at all.
+_COND_BY_TOKEN = {}
+for _condition in _CONDITIONS:
+    for _token in re.findall(r"\w+", _condition.display_lc):
+        _COND_BY_TOKEN.setdefault(_token, []).append(_condition)
+del _condition
+
 def generate_mock_conditions():
-    return [
-        {
-            "id": "C001",
-            "patient": "P001",
-            "patientName": "Moloski Ajayi",
-            "code": "38341003",
-            "display": "Hypertension",
-            "onsetDate": "2020-01-15"
-        },
-        {
-            "id": "C002",
-            "patient": "P002",
-            "patientName": "Dipo Ajayi",
-            "code": "73211009",
-            "display": "Diabetes mellitus",
-            "onsetDate": "2019-06-10"
-        },
-        {
-            "id": "C003",
-            "patient": "P004",
-            "patientName": "Mary Williams",
-            "code": "73211009",
-            "display": "Diabetes mellitus",
-            "onsetDate": "2015-03-22"
-        },
-        {
-            "id": "C004",
-            "patient": "P005",
-            "patientName": "James Brown",
-            "code": "38341003",
-            "display": "Hypertension",
-            "onsetDate": "2010-07-18"
-        },
-        {
-            "id": "C005",
-            "patient": "P005",
-            "patientName": "James Brown",
-            "code": "195967001",
-            "display": "Asthma",
-            "onsetDate": "2008-11-05"
-        }
-    ]
+    return _CONDITIONS
 
 def generate_mock_medications():
-    return [
-        {
-            "id": "M001",
-            "patient": "P001",
-            "medication": "Lisinopril",
-            "dosage": "10mg",
-            "frequency": "Once daily"
-        },
-        {
-            "id": "M002",
-            "patient": "P002",
-            "medication": "Metformin",
-            "dosage": "500mg",
-            "frequency": "Twice daily"
-        }
-    ]
+    return _MEDICATIONS
+
+@functools.lru_cache(maxsize=1)
+def _patient_bundle_for_day(day_ordinal: int) -> dict:
+    """Prebuilt unfiltered Patient bundle, rebuilt when the day (and
+    therefore the precomputed ages) rolls over."""
+    return to_fhir_bundle(_patients_for_day(day_ordinal), "Patient")
+
+_OBS_RNG = np.random.default_rng()
 
-def generate_mock_observations():
-    base_date = datetime.now()
+# IDs for the default series length, formatted once at import
+_OBS_IDS = tuple(f"O{i:03d}" for i in range(5))
+
+def generate_mock_observations(n: int = 5):
+    # Bulk-generate the numeric and date columns in NumPy: two rng calls
+    # and one datetime64 subtraction replace 2n random.randint calls plus
+    # n timedelta/strftime round trips, so this stays flat if the series
+    # is ever scaled up to look like real observation data.
+    systolic = _OBS_RNG.integers(110, 141, size=n).tolist()
+    diastolic = _OBS_RNG.integers(70, 91, size=n).tolist()
+    # tolist() on a datetime64[D] array yields datetime.date objects
+    # directly - no strftime anywhere in generation
+    dates = (
+        np.datetime64(datetime.now().date()) - np.arange(n) * np.timedelta64(7, "D")
+    ).tolist()
+    ids = _OBS_IDS if n == len(_OBS_IDS) else tuple(f"O{i:03d}" for i in range(n))
     return [
-        {
-            "id": f"O{str(i).zfill(3)}",
-            "patient": "P001",
-            "type": "Blood Pressure",
-            "value": f"{random.randint(110, 140)}/{random.randint(70, 90)}",
-            "unit": "mmHg",
-            "date": (base_date - timedelta(days=i*7)).strftime("%Y-%m-%d")
-        }
-        for i in range(5)
+        Observation(
+            id=obs_id,
+            patient="P001",
+            type="Blood Pressure",
+            systolic=sys_val,
+            diastolic=dia_val,
+            unit="mmHg",
+            date=obs_date,
+        )
+        for obs_id, sys_val, dia_val, obs_date in zip(ids, systolic, diastolic, dates)
     ]
+
+# Prebuilt bundles for the unfiltered fast paths in get_mock_data. These
+# are shared, read-only objects - filters always build fresh lists.
+_CONDITION_BUNDLE = to_fhir_bundle(list(_CONDITIONS), "Condition")
+_MEDICATION_BUNDLE = to_fhir_bundle(list(_MEDICATIONS), "MedicationRequest")